@@ -5,7 +5,9 @@ GMGN爬虫配置文件
 管理爬虫的各种设置和参数
 """
 
+import json
 import os
+from typing import Dict, Tuple
 
 
 class Config:
@@ -14,8 +16,14 @@ class Config:
     # 基础配置
     BASE_URL = "https://gmgn.ai/"
 
-    # 设置代理: 需要挂梯子时设置
-    PROXY = {"server": "http://localhost:7890"}
+    # 设置代理: 需要挂梯子时设置，可以配置多个上游代理，按健康度分配给各个浏览器上下文
+    # （PROXIES 为空时不使用代理）
+    PROXIES = ["http://localhost:7890"]
+
+    # 代理连续失败多少次后暂停使用，以及暂停时长（秒）
+    PROXY_EJECT_ERRORS = 3
+
+    PROXY_EJECT_SECONDS = 60
 
     # 运行模式
     HEADLESS = False
@@ -39,6 +47,57 @@ class Config:
         # "--disable-blink-features=AutomationControlled",
     ]
 
+    # 浏览器启动档案：在 BROWSER_ARGS 基础上追加的参数和启动选项
+    #   args: 额外的启动参数
+    #   renderer_process_limit: 渲染进程数上限（None 表示不限制）
+    #   background_throttling: False 时关闭后台标签页 / 定时器节流
+    #   headless_shell: 无头模式下是否使用精简的 headless shell（False 时使用完整 Chromium）
+    #   headless: 覆盖 HEADLESS
+    #   slow_mo: 每个操作之间的延迟（毫秒）
+    LAUNCH_PROFILE = "default"
+
+    LAUNCH_PROFILES = {
+        "default": {},
+        # 低内存：限制渲染进程数，关闭扩展和后台网络，V8 堆上限 256MB
+        "low-memory": {
+            "args": [
+                "--disable-extensions",
+                "--disable-background-networking",
+                "--disable-component-update",
+                "--mute-audio",
+                "--enable-low-end-device-mode",
+                "--js-flags=--max-old-space-size=256",
+            ],
+            "renderer_process_limit": 2,
+            "background_throttling": True,
+            "headless_shell": True,
+        },
+        # 高吞吐：多页面并发时，后台页面不降频
+        "high-throughput": {
+            "args": [
+                "--disable-extensions",
+                "--disable-background-networking",
+                "--disable-ipc-flooding-protection",
+            ],
+            "renderer_process_limit": None,
+            "background_throttling": False,
+            "headless_shell": True,
+        },
+        # 调试：有界面的完整浏览器，操作放慢便于观察
+        "debug": {
+            "args": ["--enable-logging=stderr"],
+            "headless": False,
+            "headless_shell": False,
+            "slow_mo": 50,
+        },
+    }
+
+    # 根据本机基准测试结果自动选择档案时使用的指标（None 表示直接使用 LAUNCH_PROFILE）
+    LAUNCH_PROFILE_METRIC = None
+
+    # 启动档案基准测试结果（和机器相关，保存在用户目录下）
+    BENCHMARK_FILE = os.path.join(os.path.expanduser("~"), ".mywd", "launch_benchmark.json")
+
     # 用户代理
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
 
@@ -55,6 +114,35 @@ class Config:
 
     LOG_DIR = "logs"
 
+    # 变更检测：内容哈希与上次一致时跳过保存
+    ENABLE_CHANGE_DETECTION = True
+
+    CHANGE_INDEX_FILE = "change_index.json"
+
+    # 多节点协调：协调服务地址（只在本机测试时可以用 127.0.0.1）
+    COORDINATOR_HOST = "127.0.0.1"
+
+    COORDINATOR_PORT = 8765
+
+    COORDINATOR_DB = "coordinator.db"
+
+    # 租约有效期（秒），节点超过该时间没有心跳，其币种会被重新分配
+    LEASE_TTL = 120
+
+    HEARTBEAT_INTERVAL = 30
+
+    # 同一币种两次抓取之间的间隔（秒）
+    RECRAWL_INTERVAL = 300
+
+    # 每个工作节点同时打开的页面数
+    WORKER_MAX_PAGES = 4
+
+    # 没有分到任务时的轮询间隔（秒）
+    WORKER_POLL_INTERVAL = 5
+
+    # 共享的监控币种列表
+    WATCH_LIST = ["USDT"]
+
     # 持久化上下文（使用真实 Chrome 通道）
     USE_PERSISTENT_CONTEXT = False
 
@@ -65,9 +153,46 @@ class Config:
     USER_DATA_DIR = os.path.join(os.path.expanduser("~"), ".mywd", "playwright", "gmgn")
 
     @classmethod
-    def get_browser_args(cls):
+    def get_launch_profile(cls, profile: str = None) -> dict:
+        """获取启动档案，默认使用 LAUNCH_PROFILE"""
+        name = profile or cls.LAUNCH_PROFILE
+        if name not in cls.LAUNCH_PROFILES:
+            raise ValueError(f"未知的启动档案: {name}，可选: {', '.join(cls.LAUNCH_PROFILES)}")
+        return cls.LAUNCH_PROFILES[name]
+
+    @classmethod
+    def get_browser_args(cls, profile: str = None):
         """获取浏览器启动参数"""
-        return cls.BROWSER_ARGS.copy()
+        settings = cls.get_launch_profile(profile)
+        args = cls.BROWSER_ARGS + settings.get("args", [])
+        if settings.get("renderer_process_limit"):
+            args.append(f"--renderer-process-limit={settings['renderer_process_limit']}")
+        if settings.get("background_throttling") is False:
+            args += [
+                "--disable-background-timer-throttling",
+                "--disable-backgrounding-occluded-windows",
+                "--disable-renderer-backgrounding",
+            ]
+        return args
+
+    @classmethod
+    def is_headless(cls, profile: str = None) -> bool:
+        """是否无头模式（启动档案可以覆盖 HEADLESS）"""
+        return cls.get_launch_profile(profile).get("headless", cls.HEADLESS)
+
+    @classmethod
+    def get_launch_options(cls, headless: bool = None, profile: str = None) -> dict:
+        """获取 chromium.launch 的参数"""
+        settings = cls.get_launch_profile(profile)
+        if headless is None:
+            headless = cls.is_headless(profile)
+        options = {"headless": headless, "args": cls.get_browser_args(profile)}
+        # 无头模式默认使用 headless shell，channel=chromium 时使用完整 Chromium 的新无头模式
+        if headless and not settings.get("headless_shell", True):
+            options["channel"] = "chromium"
+        if settings.get("slow_mo"):
+            options["slow_mo"] = settings["slow_mo"]
+        return options
 
     @classmethod
     def get_screenshot_path(cls, filename: str) -> str:
@@ -79,6 +204,16 @@ class Config:
         """获取数据文件路径"""
         return os.path.join(cls.DATA_DIR, filename)
 
+    @classmethod
+    def get_change_index_path(cls) -> str:
+        """获取变更检测索引文件路径"""
+        return os.path.join(cls.DATA_DIR, cls.CHANGE_INDEX_FILE)
+
+    @classmethod
+    def get_coordinator_url(cls) -> str:
+        """获取协调服务地址"""
+        return f"http://{cls.COORDINATOR_HOST}:{cls.COORDINATOR_PORT}"
+
     @classmethod
     def get_log_path(cls, filename: str) -> str:
         """获取日志文件路径"""
@@ -92,27 +227,141 @@ class DevConfig(Config):
     HEADLESS = False
 
 
+# 调试环境配置
+class DebugConfig(DevConfig):
+    """调试环境配置"""
+
+    LAUNCH_PROFILE = "debug"
+
+
 # 生产环境配置
 class ProdConfig(Config):
     """生产环境配置"""
 
     HEADLESS = True
 
+    LAUNCH_PROFILE = "high-throughput"
+
+    LAUNCH_PROFILE_METRIC = "pages_per_sec"
+
+
+# 低配机器的生产环境配置
+class LowMemConfig(ProdConfig):
+    """低内存生产环境配置"""
 
-def get_config(env: str = "dev") -> Config:
+    LAUNCH_PROFILE = "low-memory"
+
+    LAUNCH_PROFILE_METRIC = "peak_rss_mb"
+
+
+# 基准测试指标：越大越好的用 max，越小越好的用 min
+BENCHMARK_METRICS = {
+    "pages_per_sec": max,
+    "launch_ms": min,
+    "idle_rss_mb": min,
+    "peak_rss_mb": min,
+}
+
+
+def select_launch_profile(config) -> Tuple[str, str]:
+    """
+    根据本机基准测试结果选择启动档案
+
+    只在以无头模式测过的无头档案中选择 LAUNCH_PROFILE_METRIC 最优的一个；
+    没有设置指标或还没有跑过基准测试时返回 LAUNCH_PROFILE
+
+    Returns:
+        (档案名称, 选择原因)
+    """
+    metric = config.LAUNCH_PROFILE_METRIC
+    if not metric:
+        return config.LAUNCH_PROFILE, "环境默认"
+    if not os.path.exists(config.BENCHMARK_FILE):
+        return config.LAUNCH_PROFILE, "环境默认，还没有基准测试结果"
+    unreadable = f"环境默认，基准测试结果无法读取: {config.BENCHMARK_FILE}"
+    try:
+        with open(config.BENCHMARK_FILE, "r", encoding="utf-8") as f:
+            benchmark = json.load(f)
+    except (OSError, ValueError):
+        return config.LAUNCH_PROFILE, unreadable
+    results = benchmark.get("results") if isinstance(benchmark, dict) else None
+    if not isinstance(results, dict):
+        return config.LAUNCH_PROFILE, unreadable
+
+    candidates = {
+        name: result[metric]
+        for name, result in results.items()
+        if isinstance(result, dict)
+        and name in config.LAUNCH_PROFILES
+        and config.is_headless(name)
+        and result.get("headless") is True
+        and isinstance(result.get(metric), (int, float))
+    }
+    if not candidates:
+        return config.LAUNCH_PROFILE, "环境默认，基准测试结果中没有可用的无头档案"
+    choose = BENCHMARK_METRICS[metric]
+    best = choose(candidates, key=candidates.get)
+    reason = (
+        f"基准测试 {metric}={candidates[best]} 最优，"
+        f"{config.BENCHMARK_FILE}（{benchmark.get('timestamp', '未知时间')}）"
+    )
+    return best, reason
+
+
+# get_config 的结果缓存：(配置类名, 档案) -> 配置类
+_config_cache: Dict[Tuple[str, str], type] = {}
+
+
+def resolve_config(env: str = "dev", profile: str = None) -> Tuple[type, str]:
+    """
+    根据环境获取配置，同时返回选择浏览器启动档案的原因（由入口脚本决定是否输出）
+
+    Args:
+        env: 环境名称 (dev, debug, prod, lowmem)
+        profile: 浏览器启动档案，不传时依次使用环境变量 CRAWLER_PROFILE、
+                 本机基准测试选出的档案、环境默认的档案
+
+    Returns:
+        (配置类, 选择原因)，相同环境和档案返回同一个类
+    """
+    configs = {
+        "dev": DevConfig,
+        "debug": DebugConfig,
+        "prod": ProdConfig,
+        "lowmem": LowMemConfig,
+    }
+
+    config = configs.get(env, DevConfig)
+    if profile:
+        reason = "调用方指定"
+    elif os.getenv("CRAWLER_PROFILE"):
+        profile, reason = os.getenv("CRAWLER_PROFILE"), "环境变量 CRAWLER_PROFILE"
+    else:
+        profile, reason = select_launch_profile(config)
+
+    key = (config.__name__, profile)
+    if key not in _config_cache:
+        if profile != config.LAUNCH_PROFILE:
+            config.get_launch_profile(profile)  # 检查档案是否存在
+            _config_cache[key] = type(config.__name__, (config,), {"LAUNCH_PROFILE": profile})
+        else:
+            _config_cache[key] = config
+    return _config_cache[key], reason
+
+
+def get_config(env: str = "dev", profile: str = None) -> Config:
     """
     根据环境获取配置
 
     Args:
-        env: 环境名称 (dev, prod, test)
+        env: 环境名称 (dev, debug, prod, lowmem)
+        profile: 浏览器启动档案，参见 resolve_config
 
     Returns:
         对应的配置类
     """
-    configs = {"dev": DevConfig, "prod": ProdConfig}
-
-    return configs.get(env, DevConfig)
+    return resolve_config(env, profile)[0]
 
 
 # 默认配置
-current_config = get_config(os.getenv("CRAWLER_ENV", "dev"))
+current_config, current_profile_reason = resolve_config(os.getenv("CRAWLER_ENV", "dev"))
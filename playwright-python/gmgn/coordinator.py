@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多节点爬取协调服务
+用 SQLite 保存共享的监控币种列表，通过 HTTP 以租约方式分配给各个工作节点。
+节点需要定期发送心跳续租，超时未续租的币种会自动分配给其他节点。
+
+启动服务:  python coordinator.py --tokens USDT,BNB
+启动节点:  python crawl_worker.py --worker-id box1
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from utils.util import change_dir
+from config import current_config
+
+
+class LeaseStore:
+    """基于 SQLite 的币种租约表"""
+
+    def __init__(
+        self,
+        db_path: str,
+        lease_ttl: float = None,
+        recrawl_interval: float = None,
+    ):
+        self.lease_ttl = lease_ttl if lease_ttl is not None else current_config.LEASE_TTL
+        self.recrawl_interval = (
+            recrawl_interval
+            if recrawl_interval is not None
+            else current_config.RECRAWL_INTERVAL
+        )
+        # HTTP 服务是多线程的，所有访问都通过同一个连接并加锁串行化
+        self.lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tokens (
+                    token TEXT PRIMARY KEY,
+                    status TEXT NOT NULL DEFAULT 'idle',
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    next_run_at REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_status TEXT,
+                    last_result TEXT,
+                    updated_at REAL
+                )
+                """
+            )
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    last_heartbeat REAL,
+                    free_slots INTEGER,
+                    proxy_stats TEXT
+                )
+                """
+            )
+            # 兼容旧版本创建的数据库
+            columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(workers)")]
+            if "proxy_stats" not in columns:
+                self.conn.execute("ALTER TABLE workers ADD COLUMN proxy_stats TEXT")
+
+    def add_tokens(self, tokens: Iterable[str]) -> int:
+        """加入监控列表，已存在的币种保持不变"""
+        now = time.time()
+        added = 0
+        with self.lock, self.conn:
+            for token in tokens:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO tokens (token, updated_at) VALUES (?, ?)",
+                    (token, now),
+                )
+                added += cursor.rowcount
+        return added
+
+    def acquire(self, worker_id: str, count: int) -> List[str]:
+        """
+        为节点分配最多 count 个币种
+
+        可分配的币种: 空闲且到了下次抓取时间的，以及租约已过期（节点失联）的
+        """
+        if count <= 0:
+            return []
+        now = time.time()
+        with self.lock, self.conn:
+            self._touch_worker(worker_id, now)
+            rows = self.conn.execute(
+                """
+                SELECT token, status, worker_id FROM tokens
+                WHERE (status = 'idle' AND next_run_at <= ?)
+                   OR (status = 'leased' AND lease_expires_at < ?)
+                ORDER BY next_run_at
+                LIMIT ?
+                """,
+                (now, now, count),
+            ).fetchall()
+            for row in rows:
+                if row["status"] == "leased":
+                    print(
+                        f"ℹ️  {row['token']} 的租约已过期（节点 {row['worker_id']}），"
+                        f"重新分配给 {worker_id}"
+                    )
+                self.conn.execute(
+                    """
+                    UPDATE tokens
+                    SET status = 'leased', worker_id = ?, lease_expires_at = ?,
+                        attempts = attempts + 1, updated_at = ?
+                    WHERE token = ?
+                    """,
+                    (worker_id, now + self.lease_ttl, now, row["token"]),
+                )
+        return [row["token"] for row in rows]
+
+    def heartbeat(
+        self,
+        worker_id: str,
+        free_slots: Optional[int] = None,
+        proxy_stats: Optional[List[Dict]] = None,
+    ) -> int:
+        """续租该节点持有的全部币种，返回续租数量"""
+        now = time.time()
+        with self.lock, self.conn:
+            self._touch_worker(worker_id, now, free_slots, proxy_stats)
+            cursor = self.conn.execute(
+                """
+                UPDATE tokens SET lease_expires_at = ?
+                WHERE worker_id = ? AND status = 'leased' AND lease_expires_at >= ?
+                """,
+                (now + self.lease_ttl, worker_id, now),
+            )
+        return cursor.rowcount
+
+    def report(self, worker_id: str, token: str, status: str, result: Dict = None) -> bool:
+        """
+        节点上报抓取结果
+
+        Returns:
+            False 表示该节点已不再持有这个币种（租约过期后被重新分配），结果被丢弃
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT attempts FROM tokens WHERE token = ? AND worker_id = ? AND status = 'leased'",
+                (token, worker_id),
+            ).fetchone()
+            if row is None:
+                return False
+            if status == "error":
+                # 失败后按尝试次数退避，交给任意节点重试
+                next_run_at = now + min(self.recrawl_interval, 10 * row["attempts"])
+                attempts = row["attempts"]
+            else:
+                next_run_at = now + self.recrawl_interval
+                attempts = 0
+            self.conn.execute(
+                """
+                UPDATE tokens
+                SET status = 'idle', worker_id = NULL, lease_expires_at = NULL,
+                    next_run_at = ?, attempts = ?, last_status = ?, last_result = ?,
+                    updated_at = ?
+                WHERE token = ?
+                """,
+                (
+                    next_run_at,
+                    attempts,
+                    status,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    now,
+                    token,
+                ),
+            )
+        return True
+
+    def release(self, worker_id: str) -> int:
+        """节点正常退出时归还所有未完成的租约"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                UPDATE tokens
+                SET status = 'idle', worker_id = NULL, lease_expires_at = NULL
+                WHERE worker_id = ? AND status = 'leased'
+                """,
+                (worker_id,),
+            )
+            self.conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+        return cursor.rowcount
+
+    def status(self) -> Dict:
+        """当前币种和节点的概况"""
+        now = time.time()
+        with self.lock:
+            tokens = [
+                dict(row)
+                for row in self.conn.execute(
+                    "SELECT token, status, worker_id, lease_expires_at, next_run_at, "
+                    "attempts, last_status FROM tokens ORDER BY token"
+                )
+            ]
+            workers = [
+                {
+                    **dict(row),
+                    "proxy_stats": json.loads(row["proxy_stats"] or "null"),
+                    "alive": now - row["last_heartbeat"] <= self.lease_ttl,
+                }
+                for row in self.conn.execute("SELECT * FROM workers ORDER BY worker_id")
+            ]
+        return {"tokens": tokens, "workers": workers}
+
+    def close(self):
+        self.conn.close()
+
+    def _touch_worker(
+        self,
+        worker_id: str,
+        now: float,
+        free_slots: Optional[int] = None,
+        proxy_stats: Optional[List[Dict]] = None,
+    ):
+        self.conn.execute(
+            """
+            INSERT INTO workers (worker_id, last_heartbeat, free_slots, proxy_stats)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(worker_id) DO UPDATE SET
+                last_heartbeat = excluded.last_heartbeat,
+                free_slots = COALESCE(excluded.free_slots, workers.free_slots),
+                proxy_stats = COALESCE(excluded.proxy_stats, workers.proxy_stats)
+            """,
+            (
+                worker_id,
+                now,
+                free_slots,
+                json.dumps(proxy_stats) if proxy_stats is not None else None,
+            ),
+        )
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """协调服务的 HTTP 接口，请求和响应都是 JSON"""
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send(200, self.server.store.status())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        store = self.server.store
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("请求体必须是 JSON 对象")
+            if "worker_id" in payload and not isinstance(payload["worker_id"], str):
+                raise ValueError("worker_id 必须是字符串")
+
+            if self.path == "/tokens":
+                tokens = payload.get("tokens", [])
+                if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+                    raise ValueError("tokens 必须是字符串列表")
+                self._send(200, {"added": store.add_tokens(tokens)})
+            elif self.path == "/lease":
+                tokens = store.acquire(payload["worker_id"], int(payload.get("count", 1)))
+                self._send(200, {"tokens": tokens, "lease_ttl": store.lease_ttl})
+            elif self.path == "/heartbeat":
+                free_slots = payload.get("free_slots")
+                if free_slots is not None and (
+                    not isinstance(free_slots, int) or isinstance(free_slots, bool)
+                ):
+                    raise ValueError("free_slots 必须是整数")
+                proxy_stats = payload.get("proxy_stats")
+                if proxy_stats is not None and (
+                    not isinstance(proxy_stats, list)
+                    or not all(isinstance(p, dict) for p in proxy_stats)
+                ):
+                    raise ValueError("proxy_stats 必须是对象列表")
+                renewed = store.heartbeat(
+                    payload["worker_id"],
+                    free_slots,
+                    proxy_stats,
+                )
+                self._send(200, {"renewed": renewed})
+            elif self.path == "/report":
+                if not isinstance(payload["token"], str):
+                    raise ValueError("token 必须是字符串")
+                status = payload.get("status", "done")
+                if not isinstance(status, str):
+                    raise ValueError("status 必须是字符串")
+                accepted = store.report(
+                    payload["worker_id"],
+                    payload["token"],
+                    status,
+                    payload.get("result"),
+                )
+                self._send(200, {"accepted": accepted})
+            elif self.path == "/release":
+                self._send(200, {"released": store.release(payload["worker_id"])})
+            else:
+                self._send(404, {"error": "not found"})
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": f"bad request: {e}"})
+
+    def _send(self, code: int, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 心跳请求很频繁，不输出访问日志
+        pass
+
+
+def create_server(store: LeaseStore, host: str = None, port: int = None) -> ThreadingHTTPServer:
+    """创建协调服务（port 传 0 时由系统分配空闲端口，便于本机测试）"""
+    host = host if host is not None else current_config.COORDINATOR_HOST
+    port = port if port is not None else current_config.COORDINATOR_PORT
+    server = ThreadingHTTPServer((host, port), CoordinatorHandler)
+    server.store = store
+    return server
+
+
+class CoordinatorClient:
+    """工作节点使用的协调服务客户端（同步接口，基于 urllib）"""
+
+    def __init__(self, base_url: str, worker_id: str, timeout: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.worker_id = worker_id
+        self.timeout = timeout
+
+    def lease(self, count: int) -> List[str]:
+        """申请最多 count 个币种"""
+        return self._post("/lease", {"count": count}).get("tokens", [])
+
+    def heartbeat(self, free_slots: int = None, proxy_stats: List[Dict] = None) -> int:
+        body = {"free_slots": free_slots, "proxy_stats": proxy_stats}
+        return self._post("/heartbeat", body).get("renewed", 0)
+
+    def report(self, token: str, status: str, result: Dict = None) -> bool:
+        body = {"token": token, "status": status, "result": result}
+        return self._post("/report", body).get("accepted", False)
+
+    def release(self) -> int:
+        return self._post("/release", {}).get("released", 0)
+
+    def add_tokens(self, tokens: Iterable[str]) -> int:
+        return self._post("/tokens", {"tokens": list(tokens)}).get("added", 0)
+
+    def status(self) -> Dict:
+        with urllib.request.urlopen(f"{self.base_url}/status", timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        body = json.dumps({"worker_id": self.worker_id, **payload}).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"协调服务返回错误 {e.code}: {e.read().decode('utf-8', 'replace')}")
+
+
+def main():
+    """主函数"""
+    change_dir()  # 切换执行目录
+
+    parser = argparse.ArgumentParser(description="GMGN 多节点爬取协调服务")
+    parser.add_argument("--host", default=current_config.COORDINATOR_HOST)
+    parser.add_argument("--port", type=int, default=current_config.COORDINATOR_PORT)
+    parser.add_argument("--db", default=current_config.get_data_path(current_config.COORDINATOR_DB))
+    parser.add_argument(
+        "--tokens",
+        default=",".join(current_config.WATCH_LIST),
+        help="逗号分隔的监控币种列表",
+    )
+    args = parser.parse_args()
+
+    store = LeaseStore(args.db)
+    tokens = [t.strip() for t in args.tokens.split(",") if t.strip()]
+    print(f"✅ 监控列表新增 {store.add_tokens(tokens)} 个币种")
+
+    server = create_server(store, args.host, args.port)
+    print(f"🚀 协调服务已启动: http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n协调服务已停止")
+    finally:
+        server.server_close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
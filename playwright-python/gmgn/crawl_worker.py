@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GMGN 爬虫工作节点
+从协调服务领取币种租约，按空闲页面数并发抓取，并把结果上报给协调服务
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+from datetime import datetime
+from typing import Dict
+from coordinator import CoordinatorClient
+from gmgn_crawler import GMGNCrawler
+from utils.util import change_dir
+from config import current_config, current_profile_reason
+
+
+class CrawlWorker:
+    """工作节点：一个浏览器，最多 max_pages 个页面同时抓取"""
+
+    def __init__(self, client: CoordinatorClient, max_pages: int = None, headless: bool = None):
+        self.client = client
+        self.max_pages = max_pages or current_config.WORKER_MAX_PAGES
+        self.crawler = GMGNCrawler(headless=headless)
+        # 正在抓取的币种 -> asyncio.Task
+        self.running: Dict[str, asyncio.Task] = {}
+        self.stopped = False
+
+    @property
+    def free_slots(self) -> int:
+        return self.max_pages - len(self.running)
+
+    async def call(self, func, *args):
+        """在线程池中调用同步的协调服务客户端，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def proxy_stats(self):
+        """当前节点各代理的统计信息，没有使用代理池时返回 None"""
+        if self.crawler.proxy_pool is None:
+            return None
+        return self.crawler.proxy_pool.stats()
+
+    async def crawl_token(self, token: str):
+        """用独立页面抓取一个币种并上报结果"""
+        page_crawler = None
+        try:
+            page_crawler = await self.crawler.fork()
+            data = await page_crawler.start_work(token)
+        except Exception as e:
+            data = {
+                "symbol": token,
+                "timestamp": datetime.now().isoformat(),
+                "error": str(e),
+                "status": "error",
+            }
+        finally:
+            if page_crawler is not None:
+                await page_crawler.close_page()
+
+        status = "error" if (data or {}).get("status") == "error" else "done"
+        try:
+            accepted = await self.call(self.client.report, token, status, data)
+            if not accepted:
+                print(f"⚠️  {token} 的租约已被重新分配，本次结果被丢弃")
+        except Exception as e:
+            print(f"❌ 上报 {token} 结果失败: {e}")
+
+    async def heartbeat_loop(self):
+        """定期续租，同时告知协调服务当前的空闲页面数和代理统计"""
+        while not self.stopped:
+            await asyncio.sleep(current_config.HEARTBEAT_INTERVAL)
+            try:
+                await self.call(self.client.heartbeat, self.free_slots, self.proxy_stats())
+            except Exception as e:
+                print(f"❌ 心跳失败: {e}")
+
+    async def run(self):
+        """主循环：有空闲页面就领取任务，没有任务时按间隔轮询"""
+        # 主爬虫只负责启动浏览器，每个币种在 fork 出来的上下文中抓取
+        await self.crawler.start_browser(open_page=False)
+        heartbeat_task = asyncio.create_task(self.heartbeat_loop())
+        print(f"🚀 工作节点 {self.client.worker_id} 已启动，最多 {self.max_pages} 个页面")
+
+        try:
+            while not self.stopped:
+                tokens = []
+                if self.free_slots > 0:
+                    try:
+                        tokens = await self.call(self.client.lease, self.free_slots)
+                    except Exception as e:
+                        print(f"❌ 领取任务失败: {e}")
+
+                for token in tokens:
+                    print(f"ℹ️  领取到币种: {token}")
+                    self.running[token] = asyncio.create_task(self.crawl_token(token))
+
+                if not self.running:
+                    await asyncio.sleep(current_config.WORKER_POLL_INTERVAL)
+                    continue
+
+                # 等任意一个币种完成（或轮询超时）后再去领取新任务
+                await asyncio.wait(
+                    self.running.values(),
+                    timeout=current_config.WORKER_POLL_INTERVAL,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for token in [t for t, task in self.running.items() if task.done()]:
+                    self.running.pop(token)
+        finally:
+            self.stopped = True
+            heartbeat_task.cancel()
+            for task in self.running.values():
+                task.cancel()
+            # 等被取消的任务关闭各自的页面和上下文、释放代理后，再归还租约和关闭浏览器
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+            try:
+                released = await self.call(self.client.release)
+                print(f"ℹ️  已归还 {released} 个未完成的租约")
+            except Exception as e:
+                print(f"❌ 归还租约失败: {e}")
+            await self.crawler.close_browser()
+            proxy_stats = self.proxy_stats()
+            if proxy_stats:
+                print(json.dumps(proxy_stats, ensure_ascii=False, indent=2))
+
+
+async def main():
+    """主函数"""
+    change_dir()  # 切换执行目录
+    print(f"ℹ️  浏览器启动档案: {current_config.LAUNCH_PROFILE}（{current_profile_reason}）")
+
+    parser = argparse.ArgumentParser(description="GMGN 爬虫工作节点")
+    parser.add_argument("--coordinator", default=current_config.get_coordinator_url())
+    parser.add_argument("--worker-id", default=socket.gethostname())
+    parser.add_argument("--pages", type=int, default=current_config.WORKER_MAX_PAGES)
+    args = parser.parse_args()
+
+    client = CoordinatorClient(args.coordinator, args.worker_id)
+    worker = CrawlWorker(client, max_pages=args.pages)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n工作节点已停止")
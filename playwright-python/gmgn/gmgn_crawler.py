@@ -9,35 +9,48 @@ import asyncio
 import json
 import time
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 from playwright.async_api import async_playwright, expect
 from utils.util import change_dir
+from utils.proxy_pool import ProxyPool
 import os
-from config import current_config
+from config import current_config, current_profile_reason
 
 
 class GMGNCrawler:
     """GMGN交易量爬虫类"""
 
     # __init__ 是python中特殊方法， 创建类实例时自动调用，主要用于初始化对象的属性。
-    def __init__(self, headless: bool = None):
-        self.headless = headless if headless is not None else current_config.HEADLESS
+    def __init__(self, headless: bool = None, proxy_pool: Optional[ProxyPool] = None):
+        self.headless = headless if headless is not None else current_config.is_headless()
+        # 代理池，未传入时按配置创建（PROXIES 为空时不使用代理）
+        self.proxy_pool = proxy_pool if proxy_pool is not None else ProxyPool.from_config()
+        # 当前上下文使用的代理地址
+        self.proxy = None
+        self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
         self.base_url = current_config.BASE_URL
+        # fork 出来的实例独占自己的上下文，关闭页面时一并关闭
+        self.owns_context = False
 
     # 代码稍微复杂(需要处理 cloudflare 反爬机制)，可以暂时忽略。
-    async def start_browser(self):
-        """启动浏览器"""
-        playwright = await async_playwright().start()
+    async def start_browser(self, open_page: bool = True):
+        """
+        启动浏览器
 
-        launch_args = {
-            "headless": self.headless,
-            "args": current_config.get_browser_args(),
-        }
+        Args:
+            open_page: False 时不创建默认的无痕上下文和页面，只作为 fork 的来源使用，
+                       避免占用一个代理（持久化上下文模式下上下文由 fork 共享，仍会创建）
+        """
+        self.playwright = await async_playwright().start()
+        playwright = self.playwright
 
-        if current_config.PROXY:
-            launch_args["proxy"] = current_config.PROXY
+        # 启动参数由配置中的启动档案决定
+        launch_args = current_config.get_launch_options(self.headless)
+
+        # 代理在创建上下文时从代理池按健康度分配，没有代理池时不使用代理
 
         context = None
 
@@ -54,6 +67,11 @@ class GMGNCrawler:
                 else:
                     launch_kwargs_with_channel = dict(launch_args)
 
+                # 持久化上下文只能在启动时指定代理
+                if self.proxy_pool is not None:
+                    self.proxy = self.proxy_pool.acquire()
+                    launch_kwargs_with_channel["proxy"] = {"server": self.proxy}
+
                 context = await playwright.chromium.launch_persistent_context(
                     user_data_dir=user_data_dir,
                     locale=current_config.LOCALE,
@@ -68,31 +86,48 @@ class GMGNCrawler:
                 self.browser = context.browser
             except Exception as e:
                 print(f"持久化 Chrome 启动失败，将回退到无痕 Chromium。原因: {e}")
+                self.release_proxy()
 
         if context is None:
             self.browser = await playwright.chromium.launch(**launch_args)
-            context = await self.browser.new_context(
-                locale=current_config.LOCALE,
-                timezone_id=current_config.TIMEZONE_ID,
-                viewport={
-                    "width": current_config.VIEWPORT_WIDTH,
-                    "height": current_config.VIEWPORT_HEIGHT,
-                },
-                user_agent=current_config.USER_AGENT,
-            )
+            if not open_page:
+                return
+            context = await self.new_context()
+
+        self.context = context
 
         # 创建新页面
-        self.page = await context.new_page()
+        self.page = await self.new_page()
+
+    async def new_context(self):
+        """在已启动的浏览器上创建一个新的无痕上下文，使用代理池时分配一个代理"""
+        options = {
+            "locale": current_config.LOCALE,
+            "timezone_id": current_config.TIMEZONE_ID,
+            "viewport": {
+                "width": current_config.VIEWPORT_WIDTH,
+                "height": current_config.VIEWPORT_HEIGHT,
+            },
+            "user_agent": current_config.USER_AGENT,
+        }
+        if self.proxy_pool is not None:
+            self.proxy = self.proxy_pool.acquire()
+            options["proxy"] = {"server": self.proxy}
+        return await self.browser.new_context(**options)
+
+    async def new_page(self):
+        """在当前上下文中创建页面，并注入请求头和伪装脚本"""
+        page = await self.context.new_page()
 
         # 给所有后续的 网络请求 自动带上指定的 HTTP header。
-        await self.page.set_extra_http_headers(
+        await page.set_extra_http_headers(
             {
                 "Accept-Language": current_config.ACCEPT_LANGUAGE,
             }
         )
 
         # 伪装：隐藏 webdriver 痕迹
-        await self.page.add_init_script(
+        await page.add_init_script(
             """
             Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
             // 伪造插件数量
@@ -111,6 +146,56 @@ class GMGNCrawler:
             try { patch(); } catch (e) {}
             """
         )
+        return page
+
+    async def fork(self) -> "GMGNCrawler":
+        """
+        创建一个共享同一浏览器的爬虫实例，用于并发抓取多个币种
+
+        新实例使用独立的上下文和页面（持久化上下文模式下只能共享上下文），
+        用完后调用 close_page 释放
+        """
+        sibling = GMGNCrawler(headless=self.headless, proxy_pool=self.proxy_pool)
+        sibling.playwright = self.playwright
+        sibling.browser = self.browser
+        if self.browser is not None:
+            sibling.context = await sibling.new_context()
+            sibling.owns_context = True
+        else:
+            sibling.context = self.context
+            sibling.proxy = self.proxy
+        sibling.page = await sibling.new_page()
+        return sibling
+
+    async def close_page(self):
+        """关闭 fork 出来的页面（以及它独占的上下文），不影响浏览器"""
+        if self.page:
+            await self.page.close()
+            self.page = None
+        if self.owns_context and self.context:
+            await self.context.close()
+            self.context = None
+            self.release_proxy()
+
+    def release_proxy(self):
+        """释放当前占用的代理"""
+        if self.proxy_pool is not None and self.proxy:
+            self.proxy_pool.release(self.proxy)
+        self.proxy = None
+
+    async def goto(self, url: str, **kwargs):
+        """访问页面，并把耗时和结果记录到当前代理的统计中"""
+        started = time.time()
+        try:
+            response = await self.page.goto(url, **kwargs)
+        except Exception:
+            if self.proxy_pool is not None and self.proxy:
+                self.proxy_pool.record(self.proxy, None, False)
+            raise
+        if self.proxy_pool is not None and self.proxy:
+            ok = response is None or response.status < 500
+            self.proxy_pool.record(self.proxy, time.time() - started, ok)
+        return response
 
     # 截屏方法
     async def snapshot(self, _fileName: str = ""):
@@ -127,7 +212,7 @@ class GMGNCrawler:
         try:
             url = self.base_url
             print(f"正在访问 {url}...")
-            await self.page.goto(url, wait_until="domcontentloaded")
+            await self.goto(url, wait_until="domcontentloaded")
 
             # 判断某个元素是否出现 来确认页面加载完毕
             text = "Log In"
@@ -199,6 +284,8 @@ class GMGNCrawler:
             except Exception:
                 pass
 
+            return data_crawled
+
         except Exception as e:
             print(f"❌ 出错: {e}")
             await self.snapshot()
@@ -242,11 +329,13 @@ class GMGNCrawler:
         """关闭浏览器"""
         if self.browser:
             await self.browser.close()
+        self.release_proxy()
 
 
 async def main():
     """主函数"""
     change_dir()  # 切换执行目录
+    print(f"ℹ️  浏览器启动档案: {current_config.LAUNCH_PROFILE}（{current_profile_reason}）")
 
     crawler = GMGNCrawler(headless=False)  # 设置为False以便观察爬取过程
 
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器启动档案基准测试
+在本机依次用每个启动档案启动浏览器，测量启动耗时、空闲 / 峰值内存和每秒加载页面数，
+结果保存到 Config.BENCHMARK_FILE，get_config 会据此为各个环境选择档案
+
+python launch_benchmark.py --profiles low-memory,high-throughput --pages 40 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+import psutil
+from playwright.async_api import async_playwright
+from utils.util import change_dir
+from config import current_config, resolve_config
+
+# 测试页面：生成一批 DOM 节点，并用定时器持续修改，模拟真实页面的渲染和脚本开销
+TEST_PAGE = b"""<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>launch benchmark</title></head>
+<body>
+<div id="list"></div>
+<script>
+  const list = document.getElementById("list");
+  for (let i = 0; i < 2000; i++) {
+    const row = document.createElement("div");
+    row.textContent = "row " + i + " " + Math.random();
+    list.appendChild(row);
+  }
+  setInterval(() => { list.firstChild.textContent = Date.now(); }, 50);
+</script>
+</body>
+</html>
+"""
+
+
+class TestPageHandler(BaseHTTPRequestHandler):
+    """所有路径都返回同一个测试页面"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(TEST_PAGE)))
+        self.end_headers()
+        self.wfile.write(TEST_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def process_tree_rss(pid: int) -> int:
+    """统计进程及其所有子进程的常驻内存（字节）"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            # 子进程可能在统计过程中退出
+            pass
+    return total
+
+
+def to_mb(size: int) -> float:
+    return round(size / 1024 / 1024, 1)
+
+
+async def benchmark_profile(
+    playwright, profile: str, url: str, pages: int, concurrency: int, idle_seconds: float
+) -> Dict:
+    """用一个启动档案跑一轮测试"""
+    settings = current_config.get_launch_profile(profile)
+    # 除了明确要求有界面的档案（debug），都按部署时的无头模式测量，
+    # 这样 headless_shell 设置才会生效，结果也能用于 prod / lowmem 的档案选择
+    headless = settings.get("headless", True)
+    options = current_config.get_launch_options(headless=headless, profile=profile)
+    if not headless:
+        mode = "headed"
+    elif options.get("channel") == "chromium":
+        mode = "headless-chromium"
+    else:
+        mode = "headless-shell"
+    # 只统计浏览器进程，扣除 playwright 驱动进程本身的内存
+    baseline = process_tree_rss(os.getpid())
+
+    started = time.perf_counter()
+    browser = await playwright.chromium.launch(**options)
+    launch_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        context = await browser.new_context()
+        page = await context.new_page()
+        await page.goto(url)
+        await asyncio.sleep(idle_seconds)
+        idle_rss = process_tree_rss(os.getpid()) - baseline
+
+        # 加载过程中定期采样内存，记录峰值
+        peak_rss = idle_rss
+        sampling = True
+
+        async def sample():
+            nonlocal peak_rss
+            while sampling:
+                peak_rss = max(peak_rss, process_tree_rss(os.getpid()) - baseline)
+                await asyncio.sleep(0.1)
+
+        remaining = pages
+
+        async def load(tab):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await tab.goto(url, wait_until="load")
+
+        tabs = [page] + [await context.new_page() for _ in range(max(concurrency, 1) - 1)]
+        sampler = asyncio.create_task(sample())
+        started = time.perf_counter()
+        await asyncio.gather(*(load(tab) for tab in tabs))
+        elapsed = time.perf_counter() - started
+        sampling = False
+        await sampler
+    finally:
+        await browser.close()
+
+    return {
+        "headless": headless,
+        "mode": mode,
+        "launch_ms": round(launch_ms, 1),
+        "idle_rss_mb": to_mb(idle_rss),
+        "peak_rss_mb": to_mb(peak_rss),
+        "pages_per_sec": round(pages / elapsed, 2),
+    }
+
+
+def print_results(results: Dict):
+    """以表格形式输出结果"""
+    print(f"\n{'档案':<18}{'模式':<20}{'启动(ms)':>10}{'空闲RSS(MB)':>14}{'峰值RSS(MB)':>14}{'页面/秒':>10}")
+    for profile, result in results.items():
+        if "error" in result:
+            print(f"{profile:<18}❌ {result['error']}")
+            continue
+        print(
+            f"{profile:<18}{result['mode']:<20}{result['launch_ms']:>10}{result['idle_rss_mb']:>14}"
+            f"{result['peak_rss_mb']:>14}{result['pages_per_sec']:>10}"
+        )
+
+
+async def main():
+    """主函数"""
+    change_dir()  # 切换执行目录
+
+    parser = argparse.ArgumentParser(description="浏览器启动档案基准测试")
+    parser.add_argument(
+        "--profiles",
+        default=",".join(current_config.LAUNCH_PROFILES),
+        help="逗号分隔的档案名称，默认测试全部档案",
+    )
+    parser.add_argument("--pages", type=int, default=30, help="每个档案加载的页面总数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时打开的页面数")
+    parser.add_argument("--idle", type=float, default=2, help="测量空闲内存前等待的秒数")
+    parser.add_argument("--output", default=current_config.BENCHMARK_FILE)
+    args = parser.parse_args()
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    for profile in profiles:
+        current_config.get_launch_profile(profile)  # 检查档案是否存在
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TestPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    results = {}
+    playwright = await async_playwright().start()
+    try:
+        for profile in profiles:
+            print(f"🔄 测试启动档案: {profile}...")
+            try:
+                results[profile] = await benchmark_profile(
+                    playwright, profile, url, args.pages, args.concurrency, args.idle
+                )
+                print(f"✅ {profile}: {results[profile]}")
+            except Exception as e:
+                # 例如没有显示器时无法启动有界面的 debug 档案
+                print(f"❌ {profile} 测试失败: {e}")
+                results[profile] = {"error": str(e)}
+    finally:
+        await playwright.stop()
+        server.shutdown()
+
+    print_results(results)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "machine": platform.node(),
+                "pages": args.pages,
+                "concurrency": args.concurrency,
+                "results": results,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"\n结果已保存到: {args.output}")
+
+    for env in ("prod", "lowmem"):
+        config, reason = resolve_config(env)
+        print(f"ℹ️  {env} 环境将使用档案: {config.LAUNCH_PROFILE}（{reason}）")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
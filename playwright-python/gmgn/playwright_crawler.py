@@ -12,24 +12,29 @@ from datetime import datetime
 from typing import Dict, Optional, List
 from playwright.async_api import async_playwright, expect
 from utils.util import change_dir
-from config import current_config
+from utils.change_index import ChangeIndex, fetch_validators
+from config import current_config, current_profile_reason
 
 
 class PlaywrightCrawler:
     """Playwright 爬虫类"""
 
     # PS: __init__ 是python中特殊方法， 创建类实例时自动调用，主要用于初始化对象的属性。
-    def __init__(self, headless: bool = None):
+    def __init__(self, headless: bool = None, change_index: Optional[ChangeIndex] = None):
         self.headless = headless if headless is not None else True
         self.browser = None
         self.page = None
         self.base_url = "https://playwright.dev/python/"
+        # 变更检测索引，为 None 时每次都完整抓取
+        self.change_index = change_index
+        # 最近一次 HEAD 请求拿到的响应头（ETag / Last-Modified）
+        self.last_headers = {}
 
     async def start_browser(self):
         """启动浏览器"""
         playwright = await async_playwright().start()
         self.browser = await playwright.chromium.launch(
-            headless=self.headless, args=current_config.get_browser_args()
+            **current_config.get_launch_options(self.headless)
         )
 
         # 创建新页面
@@ -79,6 +84,13 @@ class PlaywrightCrawler:
     async def start_work(self) -> Dict:
         data = {}
         try:
+            # 完整渲染之前先用 ETag / Last-Modified 判断页面是否有变化
+            if self.change_index is not None:
+                self.last_headers = await fetch_validators(self.page.request, self.base_url)
+                if self.change_index.is_not_modified(self.base_url, self.last_headers):
+                    print(f"ℹ️  {self.base_url} 未变化（ETag/Last-Modified 一致），跳过抓取")
+                    return {"status": "unchanged"}
+
             await self.open_home_page()
 
             # 设置断点
@@ -96,6 +108,13 @@ class PlaywrightCrawler:
             # 获取页面文件内容
             body_content = await self.body_content()
             data["body_content"] = body_content
+
+            # 内容哈希与上次一致时标记为未变化，由调用方跳过保存
+            if self.change_index is not None and not self.change_index.has_changed(
+                self.base_url, data
+            ):
+                print("ℹ️  页面内容与上次一致")
+                data["status"] = "unchanged"
             return data
 
         except Exception as e:
@@ -113,8 +132,13 @@ class PlaywrightCrawler:
 async def main():
     """主函数"""
     change_dir()  # 切换执行目录
+    print(f"ℹ️  浏览器启动档案: {current_config.LAUNCH_PROFILE}（{current_profile_reason}）")
+
+    change_index = None
+    if current_config.ENABLE_CHANGE_DETECTION:
+        change_index = ChangeIndex(current_config.get_change_index_path())
 
-    crawler = PlaywrightCrawler(headless=False)  # 设置为False以便观察爬取过程
+    crawler = PlaywrightCrawler(headless=False, change_index=change_index)  # 设置为False以便观察爬取过程
 
     try:
         await crawler.start_browser()
@@ -123,6 +147,14 @@ async def main():
 
         print(json.dumps(data, ensure_ascii=False, indent=2))
 
+        # 内容没有变化时不再重复保存
+        if data.get("status") == "unchanged":
+            print("\n数据没有变化，跳过保存")
+            if change_index is not None:
+                change_index.touch(crawler.base_url, crawler.last_headers)
+                change_index.save()
+            return
+
         # 保存数据到文件
         data_path = f"{current_config.DATA_DIR}/playwright_data.json"
         with open(data_path, "w", encoding="utf-8") as f:
@@ -135,6 +167,11 @@ async def main():
 
         print(f"\n数据已保存到: {data_path}")
 
+        # 保存成功后再记录哈希，避免写入失败时误判为未变化
+        if change_index is not None and "error" not in data:
+            change_index.update(crawler.base_url, data, crawler.last_headers)
+            change_index.save()
+
     except Exception as e:
         print(f"程序执行出错: {e}")
 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更检测索引
+按 URL / 币种记录上次提取字段的哈希以及 ETag / Last-Modified，
+内容没有变化时跳过保存和后续处理
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+
+class ChangeIndex:
+    """内容哈希索引，持久化为一个 JSON 文件"""
+
+    # 不参与哈希计算的字段（每次运行都会变化）
+    DEFAULT_EXCLUDE = ("timestamp",)
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """从文件加载索引，文件不存在或损坏时从空索引开始"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  变更索引读取失败，将重新建立: {e}")
+            self.entries = {}
+
+    def save(self):
+        """写回索引文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def compute_hash(
+        cls, data: Optional[Dict], exclude: Iterable[str] = DEFAULT_EXCLUDE
+    ) -> str:
+        """计算提取字段的哈希（键排序，忽略 exclude 中的字段）"""
+        fields = {k: v for k, v in (data or {}).items() if k not in exclude}
+        payload = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def has_changed(self, key: str, data: Optional[Dict]) -> bool:
+        """与上次记录的哈希比较，没有记录时视为已变化"""
+        entry = self.entries.get(key)
+        if not entry:
+            return True
+        return entry.get("hash") != self.compute_hash(data)
+
+    def update(self, key: str, data: Optional[Dict], headers: Optional[Dict] = None):
+        """记录新的哈希以及响应头中的校验信息"""
+        entry = self.entries.setdefault(key, {})
+        entry["hash"] = self.compute_hash(data)
+        entry["updated_at"] = datetime.now().isoformat()
+        if headers:
+            entry.update(self.extract_validators(headers))
+
+    def touch(self, key: str, headers: Optional[Dict] = None):
+        """
+        内容没有变化时记录最近一次检查时间
+
+        同时刷新 ETag / Last-Modified，服务端重新部署导致校验值变化但内容不变时，
+        下次仍然可以在渲染前命中
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        entry["checked_at"] = datetime.now().isoformat()
+        if headers:
+            entry.update(self.extract_validators(headers))
+
+    @staticmethod
+    def extract_validators(headers: Dict) -> Dict:
+        """从响应头中取出 ETag / Last-Modified"""
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        validators = {}
+        if lowered.get("etag"):
+            validators["etag"] = lowered["etag"]
+        if lowered.get("last-modified"):
+            validators["last_modified"] = lowered["last-modified"]
+        return validators
+
+    def is_not_modified(self, key: str, headers: Dict) -> bool:
+        """
+        根据 ETag / Last-Modified 判断页面是否没有变化
+
+        只有上次记录过校验信息、且本次响应头中的值完全一致时才返回 True
+        """
+        entry = self.entries.get(key)
+        if not entry or "hash" not in entry:
+            return False
+        current = self.extract_validators(headers)
+        if not current:
+            return False
+        for name, value in current.items():
+            if entry.get(name) != value:
+                return False
+        return True
+
+
+async def fetch_validators(request_context, url: str, timeout: float = 10000) -> Dict:
+    """
+    发送 HEAD 请求获取 ETag / Last-Modified（在完整渲染页面之前调用）
+
+    Args:
+        request_context: Playwright 的 APIRequestContext，如 page.request
+        url: 目标地址
+        timeout: 超时时间（毫秒）
+
+    Returns:
+        响应头字典，请求失败时返回空字典
+    """
+    try:
+        response = await request_context.head(url, timeout=timeout)
+        if not response.ok:
+            return {}
+        return response.headers
+    except Exception as e:
+        print(f"ℹ️  HEAD 请求失败，跳过缓存校验: {e}")
+        return {}
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+代理池
+按延迟、错误率和当前占用数给每个上游代理打分，新的浏览器上下文分配得分最好的代理；
+连续失败的代理会被暂时剔除，冷却后再重新参与分配
+"""
+
+import time
+from typing import Dict, List, Optional
+from config import current_config
+
+
+class ProxyStats:
+    """单个代理的统计信息"""
+
+    # 还没有测到延迟时使用的默认值（毫秒）
+    DEFAULT_LATENCY_MS = 1000.0
+
+    def __init__(self, server: str):
+        self.server = server
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        # 指数加权平均，越新的样本权重越大
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def score(self) -> float:
+        """分数越低越好"""
+        latency = self.latency_ms if self.latency_ms is not None else self.DEFAULT_LATENCY_MS
+        return latency * (1 + 4 * self.error_rate) * (1 + self.in_flight)
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "server": self.server,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "score": round(self.score(), 1),
+            "ejected": self.is_ejected(now),
+            "ejected_for": max(0, round(self.ejected_until - now, 1)),
+        }
+
+
+class ProxyPool:
+    """多个上游代理的负载均衡"""
+
+    def __init__(
+        self,
+        servers: List[str],
+        eject_errors: int = None,
+        eject_seconds: float = None,
+        alpha: float = 0.3,
+    ):
+        if not servers:
+            raise ValueError("代理列表不能为空")
+        self.proxies = {server: ProxyStats(server) for server in servers}
+        self.eject_errors = (
+            eject_errors if eject_errors is not None else current_config.PROXY_EJECT_ERRORS
+        )
+        self.eject_seconds = (
+            eject_seconds if eject_seconds is not None else current_config.PROXY_EJECT_SECONDS
+        )
+        self.alpha = alpha
+
+    @classmethod
+    def from_config(cls) -> Optional["ProxyPool"]:
+        """根据配置创建代理池，没有配置代理时返回 None"""
+        if not current_config.PROXIES:
+            return None
+        return cls(list(current_config.PROXIES))
+
+    def acquire(self) -> str:
+        """
+        选出得分最好的代理并占用
+
+        全部代理都被剔除时，选择最早结束冷却的那个，保证总能分配到代理
+        """
+        now = time.time()
+        candidates = [p for p in self.proxies.values() if not p.is_ejected(now)]
+        if candidates:
+            chosen = min(candidates, key=lambda p: p.score())
+        else:
+            chosen = min(self.proxies.values(), key=lambda p: p.ejected_until)
+        chosen.in_flight += 1
+        return chosen.server
+
+    def release(self, server: str):
+        """上下文关闭时释放占用"""
+        stats = self.proxies.get(server)
+        if stats and stats.in_flight > 0:
+            stats.in_flight -= 1
+
+    def record(self, server: str, latency: Optional[float], ok: bool):
+        """
+        记录一次请求结果
+
+        Args:
+            server: 代理地址
+            latency: 请求耗时（秒），失败时可以为 None
+            ok: 是否成功
+        """
+        stats = self.proxies.get(server)
+        if stats is None:
+            return
+        stats.requests += 1
+        stats.error_rate = (1 - self.alpha) * stats.error_rate + self.alpha * (0 if ok else 1)
+        if ok:
+            stats.consecutive_errors = 0
+            if latency is not None:
+                latency_ms = latency * 1000
+                if stats.latency_ms is None:
+                    stats.latency_ms = latency_ms
+                else:
+                    stats.latency_ms = (1 - self.alpha) * stats.latency_ms + self.alpha * latency_ms
+            return
+
+        stats.errors += 1
+        stats.consecutive_errors += 1
+        if stats.consecutive_errors >= self.eject_errors:
+            stats.ejected_until = time.time() + self.eject_seconds
+            stats.consecutive_errors = 0
+            print(f"⚠️  代理 {server} 连续失败，暂停使用 {self.eject_seconds} 秒")
+
+    def stats(self) -> List[Dict]:
+        """每个代理的统计信息"""
+        now = time.time()
+        return [p.to_dict(now) for p in self.proxies.values()]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# gmgn 下的模块使用平铺导入（from config import ...），测试时把该目录加入搜索路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gmgn"))
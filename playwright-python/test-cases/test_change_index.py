@@ -0,0 +1,58 @@
+from utils.change_index import ChangeIndex
+
+
+def test_has_changed_ignores_timestamp(tmp_path):
+    index = ChangeIndex(str(tmp_path / "index.json"))
+    data = {"title": "Playwright", "timestamp": "2025-01-01T00:00:00"}
+    assert index.has_changed("url", data)
+
+    index.update("url", data)
+    assert not index.has_changed("url", {**data, "timestamp": "2025-01-02T00:00:00"})
+    assert index.has_changed("url", {**data, "title": "Playwright Python"})
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "data" / "index.json")
+    index = ChangeIndex(path)
+    index.update("url", {"title": "a"}, {"ETag": '"v1"'})
+    index.save()
+
+    reloaded = ChangeIndex(path)
+    assert not reloaded.has_changed("url", {"title": "a"})
+    assert reloaded.is_not_modified("url", {"etag": '"v1"'})
+
+
+def test_is_not_modified(tmp_path):
+    index = ChangeIndex(str(tmp_path / "index.json"))
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2025 00:00:00 GMT"}
+    # 没有记录过时不能跳过
+    assert not index.is_not_modified("url", headers)
+
+    index.update("url", {"title": "a"}, headers)
+    assert index.is_not_modified("url", headers)
+    assert not index.is_not_modified("url", {**headers, "ETag": '"v2"'})
+    # 响应没有校验头时不能判断
+    assert not index.is_not_modified("url", {})
+
+
+def test_touch_refreshes_validators(tmp_path):
+    index = ChangeIndex(str(tmp_path / "index.json"))
+    index.update("url", {"title": "a"}, {"ETag": '"v1"'})
+
+    index.touch("url", {"ETag": '"v2"'})
+    assert index.is_not_modified("url", {"ETag": '"v2"'})
+    assert not index.has_changed("url", {"title": "a"})
+    assert "checked_at" in index.entries["url"]
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    index = ChangeIndex(str(path))
+    assert index.entries == {}
+    assert index.has_changed("url", {"title": "a"})
+
+    index.update("url", {"title": "a"})
+    index.save()
+    assert not ChangeIndex(str(path)).has_changed("url", {"title": "a"})
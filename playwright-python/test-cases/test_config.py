@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import config
+from config import ProdConfig, LowMemConfig, get_config, resolve_config, select_launch_profile
+
+
+@pytest.fixture
+def benchmark_file(tmp_path, monkeypatch):
+    path = tmp_path / "launch_benchmark.json"
+    monkeypatch.setattr(config.Config, "BENCHMARK_FILE", str(path))
+    monkeypatch.delenv("CRAWLER_PROFILE", raising=False)
+    return path
+
+
+def write_results(path, results):
+    path.write_text(json.dumps({"timestamp": "2025-01-01T00:00:00", "results": results}))
+
+
+def test_select_without_benchmark_uses_default(benchmark_file):
+    assert select_launch_profile(ProdConfig)[0] == ProdConfig.LAUNCH_PROFILE
+
+
+def test_select_by_metric_ignores_headed_results(benchmark_file):
+    write_results(
+        benchmark_file,
+        {
+            "default": {"headless": True, "pages_per_sec": 5, "peak_rss_mb": 300},
+            "low-memory": {"headless": True, "pages_per_sec": 4, "peak_rss_mb": 200},
+            # 有界面测出的结果不参与选择
+            "high-throughput": {"headless": False, "pages_per_sec": 50, "peak_rss_mb": 100},
+            "debug": {"headless": False, "pages_per_sec": 100, "peak_rss_mb": 1},
+            "low-memory-x": {"headless": True, "pages_per_sec": 100, "peak_rss_mb": 1},
+        },
+    )
+    assert select_launch_profile(ProdConfig)[0] == "default"
+    profile, reason = select_launch_profile(LowMemConfig)
+    assert profile == "low-memory"
+    assert "peak_rss_mb" in reason
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{not json",
+        "[]",
+        '{"results": []}',
+        '{"results": null}',
+        '{"results": {"low-memory": [], "default": "fast"}}',
+        '{"results": {"low-memory": {"headless": true, "pages_per_sec": "fast"}}}',
+    ],
+)
+def test_select_with_corrupt_benchmark(benchmark_file, content):
+    benchmark_file.write_text(content)
+    assert select_launch_profile(ProdConfig)[0] == ProdConfig.LAUNCH_PROFILE
+    assert get_config("prod").LAUNCH_PROFILE == ProdConfig.LAUNCH_PROFILE
+
+
+def test_get_config_does_not_print(benchmark_file, capsys):
+    config, reason = resolve_config("lowmem")
+    assert config is get_config("lowmem")
+    assert reason
+    assert capsys.readouterr().out == ""
+
+
+def test_get_config_is_cached(benchmark_file):
+    assert get_config("prod") is get_config("prod")
+    derived = get_config("prod", "low-memory")
+    assert derived is get_config("prod", "low-memory")
+    assert derived.LAUNCH_PROFILE == "low-memory"
+    assert ProdConfig.LAUNCH_PROFILE == "high-throughput"
+
+
+def test_get_config_rejects_unknown_profile(benchmark_file):
+    with pytest.raises(ValueError):
+        get_config("prod", "no-such-profile")
+
+
+def test_launch_options():
+    options = ProdConfig.get_launch_options(profile="low-memory")
+    assert options["headless"] is True
+    assert "--renderer-process-limit=2" in options["args"]
+    assert "channel" not in options
+
+    debug = ProdConfig.get_launch_options(profile="debug")
+    assert debug["headless"] is False
+    assert debug["slow_mo"] == 50
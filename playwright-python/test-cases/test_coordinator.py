@@ -0,0 +1,120 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from coordinator import CoordinatorClient, LeaseStore, create_server
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LeaseStore(str(tmp_path / "coordinator.db"), lease_ttl=0.5, recrawl_interval=60)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def server(store):
+    server = create_server(store, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client(server, worker_id):
+    return CoordinatorClient(f"http://127.0.0.1:{server.server_port}", worker_id)
+
+
+def test_lease_splits_tokens_between_workers(server):
+    a, b = client(server, "a"), client(server, "b")
+    assert a.add_tokens(["T1", "T2", "T3"]) == 3
+    assert a.add_tokens(["T1"]) == 0
+
+    leased_a = a.lease(2)
+    leased_b = b.lease(5)
+    assert len(leased_a) == 2
+    assert set(leased_a) | set(leased_b) == {"T1", "T2", "T3"}
+    assert not set(leased_a) & set(leased_b)
+    assert b.lease(5) == []
+
+
+def test_expired_lease_is_reassigned(server):
+    a, b = client(server, "a"), client(server, "b")
+    a.add_tokens(["T1"])
+    assert a.lease(1) == ["T1"]
+
+    time.sleep(0.6)
+    assert b.lease(1) == ["T1"]
+    # a 失联后上报的结果被丢弃
+    assert a.report("T1", "done", {}) is False
+    assert b.report("T1", "done", {"price": 1}) is True
+
+
+def test_heartbeat_renews_lease(server):
+    a, b = client(server, "a"), client(server, "b")
+    a.add_tokens(["T1"])
+    a.lease(1)
+
+    for _ in range(3):
+        time.sleep(0.3)
+        assert a.heartbeat(free_slots=0) == 1
+    assert b.lease(1) == []
+    assert a.report("T1", "done", {}) is True
+
+
+def test_report_schedules_next_run(server, store):
+    a = client(server, "a")
+    a.add_tokens(["T1", "T2"])
+    a.lease(2)
+    assert a.report("T1", "done", {}) is True
+    assert a.report("T2", "error", {"error": "timeout"}) is True
+
+    tokens = {t["token"]: t for t in a.status()["tokens"]}
+    assert tokens["T1"]["status"] == "idle"
+    assert tokens["T1"]["last_status"] == "done"
+    assert tokens["T1"]["attempts"] == 0
+    assert tokens["T2"]["last_status"] == "error"
+    assert tokens["T2"]["attempts"] == 1
+    # 成功的币种要等 recrawl_interval 之后才会再分配
+    assert tokens["T1"]["next_run_at"] > time.time() + 30
+    assert a.lease(2) == []
+
+
+def test_release_returns_leases(server):
+    a, b = client(server, "a"), client(server, "b")
+    a.add_tokens(["T1", "T2"])
+    a.lease(2)
+    a.heartbeat(free_slots=0)
+
+    assert a.release() == 2
+    assert sorted(b.lease(2)) == ["T1", "T2"]
+    assert [w["worker_id"] for w in a.status()["workers"]] == ["b"]
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/lease", b"[]"),
+        ("/lease", b'{"worker_id": "a", "count": null}'),
+        ("/lease", b'{"worker_id": {"id": 1}}'),
+        ("/report", b'{"worker_id": "a"}'),
+        ("/tokens", b'{"tokens": "T1"}'),
+        ("/report", b'{"worker_id": "a", "token": ["x"]}'),
+        ("/report", b'{"worker_id": "a", "token": "T1", "status": 1}'),
+        ("/heartbeat", b'{"worker_id": "a", "free_slots": {"a": 1}}'),
+        ("/heartbeat", b'{"worker_id": "a", "proxy_stats": "fast"}'),
+        ("/heartbeat", b'{"worker_id": "a", "proxy_stats": [1]}'),
+        ("/heartbeat", b"not json"),
+    ],
+)
+def test_bad_request_returns_400(server, path, body):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    assert response.status == 400
+    assert "error" in json.loads(response.read())
+    conn.close()
@@ -0,0 +1,101 @@
+import pytest
+
+from utils import proxy_pool
+from utils.proxy_pool import ProxyPool
+
+A, B, C = "http://127.0.0.1:7001", "http://127.0.0.1:7002", "http://127.0.0.1:7003"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(proxy_pool.time, "time", lambda: now[0])
+    return now
+
+
+def stats_of(pool, server):
+    return next(s for s in pool.stats() if s["server"] == server)
+
+
+def test_empty_pool_rejected():
+    with pytest.raises(ValueError):
+        ProxyPool([])
+
+
+def test_acquire_spreads_by_in_flight():
+    pool = ProxyPool([A, B, C])
+    assert sorted(pool.acquire() for _ in range(3)) == [A, B, C]
+    assert all(s["in_flight"] == 1 for s in pool.stats())
+
+
+def test_prefers_lower_latency():
+    pool = ProxyPool([A, B])
+    pool.record(A, 0.15, True)
+    pool.record(B, 0.1, True)
+    assert pool.acquire() == B
+    # B 占用一个上下文后分数翻倍，比 A 差
+    assert pool.acquire() == A
+
+
+def test_errors_raise_score():
+    pool = ProxyPool([A, B], eject_errors=10)
+    pool.record(A, 0.1, True)
+    pool.record(B, 0.1, True)
+    pool.record(A, None, False)
+    assert stats_of(pool, A)["error_rate"] > 0
+    assert stats_of(pool, A)["score"] > stats_of(pool, B)["score"]
+    assert pool.acquire() == B
+
+
+def test_release():
+    pool = ProxyPool([A])
+    pool.acquire()
+    pool.release(A)
+    pool.release(A)
+    pool.release("http://unknown")
+    assert stats_of(pool, A)["in_flight"] == 0
+
+
+def test_ejection_and_cooldown(clock):
+    pool = ProxyPool([A, B], eject_errors=2, eject_seconds=30)
+    pool.record(A, 0.01, True)
+    pool.record(B, 1.0, True)
+
+    pool.record(A, None, False)
+    assert not stats_of(pool, A)["ejected"]
+    pool.record(A, None, False)
+    assert stats_of(pool, A)["ejected"]
+    assert stats_of(pool, A)["ejected_for"] == 30
+    assert pool.acquire() == B
+
+    clock[0] += 31
+    assert not stats_of(pool, A)["ejected"]
+    pool.release(B)
+    pool.record(A, 0.01, True)
+    assert pool.acquire() == A
+
+
+def test_all_ejected_picks_earliest_recovery(clock):
+    pool = ProxyPool([A, B], eject_errors=1, eject_seconds=30)
+    pool.record(A, None, False)
+    clock[0] += 10
+    pool.record(B, None, False)
+    assert pool.acquire() == A
+
+
+def test_success_resets_consecutive_errors():
+    pool = ProxyPool([A], eject_errors=2)
+    pool.record(A, None, False)
+    pool.record(A, 0.1, True)
+    pool.record(A, None, False)
+    assert not stats_of(pool, A)["ejected"]
+    assert stats_of(pool, A)["errors"] == 2
+    assert stats_of(pool, A)["requests"] == 3
+
+
+def test_from_config_without_proxies(monkeypatch):
+    monkeypatch.setattr(proxy_pool.current_config, "PROXIES", [])
+    assert ProxyPool.from_config() is None
+
+    monkeypatch.setattr(proxy_pool.current_config, "PROXIES", [A, B])
+    assert [s["server"] for s in ProxyPool.from_config().stats()] == [A, B]